@@ -0,0 +1,176 @@
+"""
+Frame encode benchmark — legacy data-URI path vs. FrameEncoder.
+
+First checks that both paths produce the same JSON body, then measures per
+frame: time (mean / p99 / std, i.e. jitter) with tracemalloc off, GC runs and
+pause time, and — in a separate tracemalloc pass — peak heap growth and the
+number of new heap blocks still alive at the end of the frame.  No network is
+involved: the legacy path is timed up to the json.dumps() that requests would
+do for json=payload.
+
+Run:
+    python benchmark_encode.py [--frames 300] [--width 1280 --height 720]
+                               [--resize 640x360]
+"""
+
+import argparse
+import base64
+import gc
+import json
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from rail_rakshak_uploader import FrameEncoder, PayloadBuffer, build_head
+
+TIMESTAMP = "2024-01-01 00:00:00"
+HAZARDS = [{"class": 0, "name": "Track Crack", "confidence": 0.87,
+            "xmin": 10, "ymin": 20, "xmax": 110, "ymax": 220}]
+
+
+def legacy_body(frame, quality, resize):
+    """What _encode_frame/_build_payload + requests(json=...) used to do."""
+    if resize is not None:
+        frame = cv2.resize(frame, resize, interpolation=cv2.INTER_AREA)
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    b64 = base64.b64encode(buffer).decode('utf-8')
+    payload = {
+        "timestamp":    TIMESTAMP,
+        "gps_location": {"lat": 28.6139, "lon": 77.2090},
+        "hazards":      HAZARDS,
+        "image_stream": "data:image/jpeg;base64," + b64,
+    }
+    return json.dumps(payload, allow_nan=False).encode('utf-8')
+
+
+def make_buffered_body(quality, resize):
+    encoder = FrameEncoder(jpeg_quality=quality, resize=resize)
+    out = PayloadBuffer()
+
+    def buffered_body(frame, *_):
+        head = build_head(TIMESTAMP, 28.6139, 77.2090, HAZARDS)
+        return encoder.write_body(out, head, frame)
+    return buffered_body
+
+
+def pick_frames(base, quality, resize):
+    """Shifted copies of `base` whose JPEG sizes cover every remainder mod 3."""
+    frames, seen = [], set()
+    for shift in range(64):
+        frame = np.roll(base, 8 * shift, axis=1)
+        jpeg_size = len(base64.b64decode(
+            json.loads(legacy_body(frame, quality, resize))["image_stream"]
+            .split(",", 1)[1]))
+        frames.append(frame)
+        seen.add(jpeg_size % 3)
+        if len(frames) >= 8 and len(seen) == 3:
+            break
+    assert len(seen) == 3, f"JPEG sizes only covered remainders {sorted(seen)}"
+    return frames
+
+
+def check_equal(frames, quality, resize):
+    buffered_body = make_buffered_body(quality, resize)
+    for frame in frames:
+        legacy = legacy_body(frame, quality, resize)
+        buffered = buffered_body(frame)
+        assert json.loads(bytes(buffered)) == json.loads(legacy)
+
+
+def run(name, fn, frames, quality, resize):
+    gc_time = [0.0]
+    gc_runs = [0]
+    started = [0.0]
+
+    def on_gc(phase, info):
+        if phase == "start":
+            started[0] = time.perf_counter()
+        else:
+            gc_time[0] += time.perf_counter() - started[0]
+            gc_runs[0] += 1
+
+    for frame in frames[:5]:                      # warm-up (buffers grow here)
+        fn(frame, quality, resize)
+
+    # Pass 1: timing and GC, tracemalloc off so it doesn't skew the clock
+    gc.collect()
+    gc.callbacks.append(on_gc)
+    times = []
+    size = 0
+    try:
+        for frame in frames:
+            t0 = time.perf_counter()
+            body = fn(frame, quality, resize)
+            times.append(time.perf_counter() - t0)
+            size = len(body)
+            del body
+    finally:
+        gc.callbacks.remove(on_gc)
+
+    # Pass 2: heap. Peak growth covers short-lived buffers; the snapshot diff
+    # counts blocks allocated during the frame that are still alive at its
+    # end (body still held) — freed temporaries only show up in the peak.
+    tracemalloc.start()
+    peaks, blocks = [], []
+    try:
+        for frame in frames[:50]:
+            before = tracemalloc.take_snapshot()
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            body = fn(frame, quality, resize)
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            after = tracemalloc.take_snapshot()
+            blocks.append(sum(max(stat.count_diff, 0)
+                              for stat in after.compare_to(before, "lineno")))
+            del body
+    finally:
+        tracemalloc.stop()
+
+    times_ms = np.array(times) * 1e3
+    print(f"{name:>10}: body {size / 1024:7.1f} KB | "
+          f"heap peak/frame {np.mean(peaks) / 1024:7.1f} KB, "
+          f"{np.mean(blocks):5.1f} new live blocks | "
+          f"GC {gc_runs[0]:3d} runs, {gc_time[0] * 1e3:6.2f} ms | "
+          f"frame {np.mean(times_ms):6.2f} ms mean, "
+          f"{np.percentile(times_ms, 99):6.2f} ms p99, "
+          f"{np.std(times_ms):5.2f} ms std")
+    return gc_runs[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--quality", type=int, default=70)
+    parser.add_argument("--resize", default=None,
+                        help="downscale before encoding, e.g. 640x360")
+    args = parser.parse_args()
+
+    resize = tuple(int(v) for v in args.resize.split("x")) if args.resize else None
+
+    # Distinct frames so JPEG sizes vary a little, like a real camera
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(
+        rng.integers(0, 256, (args.height, args.width, 3), dtype=np.uint8),
+        (0, 0), 3)
+    distinct = pick_frames(base, args.quality, resize)
+    check_equal(distinct, args.quality, resize)
+    frames = [distinct[i % len(distinct)] for i in range(args.frames)]
+
+    print(f"{args.frames} frames, {args.width}x{args.height}, "
+          f"quality {args.quality}, resize {resize}")
+    print(f"bodies identical for {len(distinct)} distinct frames "
+          f"(JPEG sizes cover all remainders mod 3)\n")
+    gc_runs = run("legacy", legacy_body, frames, args.quality, resize)
+    gc_runs += run("buffered", make_buffered_body(args.quality, resize),
+                   frames, args.quality, resize)
+    if not gc_runs:
+        print("\nNo GC collections ran on either path: image buffers are not "
+              "container objects, so they never count towards GC thresholds.")
+
+
+if __name__ == "__main__":
+    main()
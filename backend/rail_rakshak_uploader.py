@@ -21,14 +21,122 @@ Usage:
 """
 
 import requests
-import base64
+import binascii
+import json
 import cv2
+import numpy as np
 from datetime import datetime
 from threading import Thread
 import queue
 import time
 
 
+_IMAGE_FIELD = b', "image_stream": "data:image/jpeg;base64,'
+_BODY_END = b'"}'
+
+
+class PayloadBuffer:
+    """
+    Reusable bytearray holding one serialised JSON request body.
+
+    The same memory is rewritten frame after frame, so the upload path does
+    not hand the Python heap a fresh multi-hundred-KB object per frame.
+    """
+
+    def __init__(self, capacity=256 * 1024):
+        self.length = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.data = bytearray(capacity)
+
+    def reserve(self, size):
+        """Make room for at least `size` bytes (grows geometrically, rarely)."""
+        if size > len(self.data):
+            # Swap in a new bytearray instead of resizing: the old one may still
+            # be exported to a memoryview that requests is holding on to.
+            self._alloc(max(size, 2 * len(self.data)))
+
+    def view(self):
+        """Zero-copy memoryview of the body written by the last encode."""
+        return memoryview(self.data)[:self.length]
+
+
+class FrameEncoder:
+    """
+    Low-copy frame → JSON body encoder.
+
+    Downscales into a preallocated NumPy buffer, JPEG-encodes once, then
+    base64-encodes with binascii and copies that single temporary into a
+    PayloadBuffer.  No str or data-URI objects are made, and requests does
+    not have to json.dumps() the image again.
+    """
+
+    def __init__(self, jpeg_quality=70, resize=None):
+        """
+        Args:
+            jpeg_quality:   JPEG compression quality (0-100).
+            resize:         Optional (width, height) to downscale to before
+                            encoding, e.g. (640, 360). None = full resolution.
+        """
+        self.resize = resize
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self._resized = None
+
+    def encode_jpeg(self, frame):
+        """Downscale (if configured) and JPEG-encode. Returns a flat uint8 array."""
+        if self.resize is not None:
+            w, h = self.resize
+            shape = (h, w) + frame.shape[2:]
+            if (self._resized is None or self._resized.shape != shape
+                    or self._resized.dtype != frame.dtype):
+                self._resized = np.empty(shape, dtype=frame.dtype)
+            cv2.resize(frame, (w, h), dst=self._resized,
+                       interpolation=cv2.INTER_AREA)
+            frame = self._resized
+        ok, jpeg = cv2.imencode('.jpg', frame, self.params)
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return jpeg.reshape(-1)
+
+    def write_body(self, out, head, frame):
+        """
+        Write `head` + base64(JPEG of frame) + '"}' into `out`.
+
+        Args:
+            out:    PayloadBuffer to (re)fill.
+            head:   JSON bytes for the request body up to and including the
+                    opening quote and data-URI prefix of "image_stream".
+            frame:  OpenCV image (BGR).
+
+        Returns:
+            memoryview over the finished body inside `out`.
+        """
+        jpeg = self.encode_jpeg(frame)
+        # One short-lived bytes object, copied once into the reused body
+        b64 = binascii.b2a_base64(jpeg, newline=False)
+        start = len(head)
+        end = start + len(b64)
+        out.reserve(end + len(_BODY_END))
+        out.data[:start] = head
+        out.data[start:end] = b64
+        out.data[end:end + len(_BODY_END)] = _BODY_END
+        out.length = end + len(_BODY_END)
+        return out.view()
+
+
+def build_head(timestamp, gps_lat, gps_lon, hazards):
+    """JSON bytes for every telemetry field, open at the image_stream value."""
+    # allow_nan=False matches requests(json=...): NaN/inf fail loudly
+    # instead of sending invalid JSON to the backend
+    meta = json.dumps({
+        "timestamp":    timestamp,
+        "gps_location": {"lat": gps_lat, "lon": gps_lon},
+        "hazards":      hazards,
+    }, allow_nan=False)
+    return meta[:-1].encode('utf-8') + _IMAGE_FIELD
+
+
 class TelemetryUploader:
     """
     Streams YOLOv5 frames to the Rail Rakshak backend in real-time.
@@ -45,7 +153,8 @@ class TelemetryUploader:
                  send_interval=1,          # 1 = send EVERY frame (always-on stream)
                  jpeg_quality=70,          # Slightly lower quality for bandwidth
                  async_mode=True,          # Non-blocking by default
-                 buffer_size=5):
+                 buffer_size=5,
+                 resize=None):             # e.g. (640, 360) to shrink payloads
         """
         Args:
             backend_url:    Full URL to /api/telemetry endpoint on Render.
@@ -60,23 +169,33 @@ class TelemetryUploader:
                             down the detection loop). Recommended for Jetson.
             buffer_size:    How many frames to queue in async mode.
                             Older frames are dropped when the queue is full.
+            resize:         Optional (width, height) to downscale frames to
+                            before JPEG encoding. None = full resolution.
         """
         self.backend_url = backend_url
         self.health_url = backend_url.replace('/api/telemetry', '/health')
         self.gps_lat = gps_lat
         self.gps_lon = gps_lon
         self.send_interval = send_interval
-        self.jpeg_quality = jpeg_quality
         self.async_mode = async_mode
         self.frame_counter = 0
         self.sent_count = 0
         self.error_count = 0
 
+        # Reused across frames — see FrameEncoder / PayloadBuffer
+        self.encoder = FrameEncoder(jpeg_quality=jpeg_quality, resize=resize)
+
         # For async mode
         if async_mode:
             self.queue = queue.Queue(maxsize=buffer_size)
+            # One body buffer per queue slot, plus one being sent by the worker
+            self.free_buffers = queue.Queue()
+            for _ in range(buffer_size + 1):
+                self.free_buffers.put(PayloadBuffer())
             self.worker_thread = Thread(target=self._worker, daemon=True)
             self.worker_thread.start()
+        else:
+            self.buffer = PayloadBuffer()
 
     # ------------------------------------------------------------------
     # PUBLIC: Wake the backend before starting the inference loop
@@ -117,17 +236,6 @@ class TelemetryUploader:
     # INTERNAL HELPERS
     # ------------------------------------------------------------------
 
-    def _encode_frame(self, frame):
-        """Convert OpenCV (BGR) frame to a Base64 data-URI string."""
-        # Optionally resize to reduce payload size (comment out for full res)
-        # frame = cv2.resize(frame, (640, 360))
-        _, buffer = cv2.imencode(
-            '.jpg', frame,
-            [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
-        )
-        b64 = base64.b64encode(buffer).decode('utf-8')
-        return "data:image/jpeg;base64," + b64   # Full data-URI — frontend uses this directly
-
     def _parse_detections(self, results):
         """Convert YOLOv5 results object to hazard list."""
         hazards = []
@@ -148,24 +256,27 @@ class TelemetryUploader:
                 })
         return hazards
 
-    def _build_payload(self, frame, detections):
-        """Build JSON payload. Always includes image_stream."""
-        return {
-            "timestamp":    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "gps_location": {
-                "lat": self.gps_lat,
-                "lon": self.gps_lon
-            },
-            "hazards":      detections,   # Empty list [] when no hazard — that's fine
-            "image_stream": self._encode_frame(frame)
-        }
+    def _build_payload(self, frame, detections, buffer):
+        """
+        Serialise the JSON body into `buffer`. Always includes image_stream.
+
+        image_stream is a full data-URI — the frontend uses it directly.
+        Returns a memoryview over the body (valid until `buffer` is reused).
+        """
+        head = build_head(
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            self.gps_lat,
+            self.gps_lon,
+            detections                    # Empty list [] when no hazard — that's fine
+        )
+        return self.encoder.write_body(buffer, head, frame)
 
     def _send_sync(self, payload):
-        """Send telemetry payload synchronously. Timeout is 15s (survives Render cold-starts)."""
+        """Send a serialised JSON body synchronously. Timeout is 15s (survives Render cold-starts)."""
         try:
             response = requests.post(
                 self.backend_url,
-                json=payload,
+                data=payload,             # Pre-serialised body — no second json.dumps()
                 timeout=15,                # 15s timeout — Render cold starts can take ~10-30s
                 headers={"Content-Type": "application/json"}
             )
@@ -194,8 +305,10 @@ class TelemetryUploader:
         """Background thread — drains the frame queue and sends to backend."""
         while True:
             try:
-                payload = self.queue.get(timeout=1)
+                buffer, payload = self.queue.get(timeout=1)
                 self._send_sync(payload)
+                del payload
+                self.free_buffers.put(buffer)
                 self.queue.task_done()
             except queue.Empty:
                 continue
@@ -230,17 +343,26 @@ class TelemetryUploader:
 
         try:
             detections = self._parse_detections(yolov5_results)
-            payload = self._build_payload(frame, detections)
 
             if self.async_mode:
                 try:
-                    # Non-blocking: drop oldest if queue is full
-                    self.queue.put_nowait(payload)
+                    buffer = self.free_buffers.get_nowait()
+                except queue.Empty:
+                    # Every buffer is queued or in flight — drop this frame
+                    # rather than block the detection loop
+                    return False
+                try:
+                    payload = self._build_payload(frame, detections, buffer)
+                    self.queue.put_nowait((buffer, payload))
                     return True
                 except queue.Full:
-                    # Drop this frame rather than block the detection loop
+                    self.free_buffers.put(buffer)
                     return False
+                except Exception:
+                    self.free_buffers.put(buffer)
+                    raise
             else:
+                payload = self._build_payload(frame, detections, self.buffer)
                 return self._send_sync(payload)
 
         except Exception as e:
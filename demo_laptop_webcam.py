@@ -4,7 +4,7 @@ demo_laptop_webcam.py — Rail Rakshak Live Feed Demo (Laptop Webcam)
 Uses YOLOv5 with best.pt model for real-time animal/hazard detection.
 
 Requirements:
-    pip install opencv-python requests torch torchvision
+    pip install opencv-python numpy requests torch torchvision
 
 Run:
     python demo_laptop_webcam.py
@@ -20,10 +20,10 @@ What it does:
 import cv2
 import sys
 import time
-import base64
 import requests
 import torch
 from datetime import datetime
+from backend.rail_rakshak_uploader import FrameEncoder, PayloadBuffer, build_head
 
 # ─── CONFIG — ONLY EDIT THESE ────────────────────────────────────────────────
 BACKEND_URL  = "https://rail-rakshak-jetson-nano.onrender.com/api/telemetry"  # ← REPLACE THIS
@@ -40,11 +40,9 @@ JPEG_QUALITY = 60        # 0-100, lower = smaller payload
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def encode_frame(frame):
-    """Encode an OpenCV frame to a base64 data-URI string."""
-    _, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
-    b64 = base64.b64encode(buf).decode('utf-8')
-    return "data:image/jpeg;base64," + b64
+# Reused for every frame so encoding doesn't churn the Python heap
+encoder = FrameEncoder(jpeg_quality=JPEG_QUALITY)
+body_buffer = PayloadBuffer()
 
 
 def wake_backend(max_wait=45):
@@ -69,14 +67,11 @@ def send_frame(frame, hazards=None):
     """POST a single frame + optional hazard list to the backend."""
     if hazards is None:
         hazards = []
-    payload = {
-        "timestamp":    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "gps_location": {"lat": GPS_LAT, "lon": GPS_LON},
-        "hazards":      hazards,
-        "image_stream": encode_frame(frame)
-    }
+    head = build_head(datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                      GPS_LAT, GPS_LON, hazards)
+    payload = encoder.write_body(body_buffer, head, frame)
     try:
-        r = requests.post(BACKEND_URL, json=payload,
+        r = requests.post(BACKEND_URL, data=payload,
                           timeout=15,
                           headers={"Content-Type": "application/json"})
         return r.status_code == 200, r.status_code